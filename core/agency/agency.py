@@ -1,24 +1,88 @@
 """Agency for managing agent communication and documentation generation workflow."""
 from typing import Dict, List, Tuple, Any, Optional
 import asyncio
-from pathlib import Path
+import functools
+from collections import deque
 import os
+import sqlite3
+import uuid
+from contextlib import closing
 
+from core.agency.documentation_agent.tools.repository_analyzer import (
+    build_pattern_index,
+    match_repo_patterns
+)
 from core.services.event_bus import event_bus
 from core.services.logging import setup_logger
 from core.services.cache import cache_manager
+from core.settings import MAX_CONCURRENT_REPOS, REPO_TYPE_CACHE_PATH
 
 logger = setup_logger(__name__)
 
+FINISHED_JOBS_LIMIT = 256  # finished background jobs kept for get_status
+
+async def _run_all(*coros) -> None:
+    """Run coroutines concurrently, cancelling the rest as soon as one fails."""
+    if hasattr(asyncio, "TaskGroup"):
+        try:
+            async with asyncio.TaskGroup() as group:
+                for coro in coros:
+                    group.create_task(coro)
+        except BaseExceptionGroup as e:
+            raise e.exceptions[0]
+    else:
+        await asyncio.gather(*coros)
+
+@functools.lru_cache(maxsize=None)
+def _read_instructions(path: str) -> str:
+    """Read an instructions file once per process."""
+    with open(path, 'r') as f:
+        return f.read()
+
+def _connect_repo_type_cache() -> sqlite3.Connection:
+    """Open the persistent repository type cache, creating it if needed."""
+    REPO_TYPE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(REPO_TYPE_CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS repo_types "
+        "(repo_path TEXT PRIMARY KEY, dir_mtime INTEGER, repo_type TEXT)"
+    )
+    return conn
+
+def _load_cached_repo_type(repo_path: str, dir_mtime: int) -> Optional[str]:
+    """Get a persisted repository type if the directory is unchanged."""
+    try:
+        with closing(_connect_repo_type_cache()) as conn:
+            row = conn.execute(
+                "SELECT repo_type FROM repo_types WHERE repo_path = ? AND dir_mtime = ?",
+                (repo_path, dir_mtime)
+            ).fetchone()
+    except (sqlite3.Error, OSError) as e:
+        logger.debug(f"Repository type cache unavailable: {e}")
+        return None
+    return row[0] if row else None
+
+def _store_cached_repo_type(repo_path: str, dir_mtime: int, repo_type: str) -> None:
+    """Persist a detected repository type."""
+    try:
+        with closing(_connect_repo_type_cache()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO repo_types (repo_path, dir_mtime, repo_type) VALUES (?, ?, ?)",
+                (repo_path, dir_mtime, repo_type)
+            )
+    except (sqlite3.Error, OSError) as e:
+        logger.debug(f"Could not persist repository type: {e}")
+
 class Agency:
     """Main agency class for coordinating documentation generation."""
     
     REPO_TYPES = {
-        "spring_boot": ["pom.xml", "build.gradle", "src/main/java", "application.properties", "application.yml"],
-        "nginx": ["nginx.conf", "default.conf"],
-        "bounded_context": ["helm", "terraform"],
-        "python": ["requirements.txt", "setup.py", "pyproject.toml", "src", "main.py"]
+        "spring_boot": ("pom.xml", "build.gradle", "src/main/java", "application.properties", "application.yml"),
+        "nginx": ("nginx.conf", "default.conf"),
+        "bounded_context": ("helm", "terraform"),
+        "python": ("requirements.txt", "setup.py", "pyproject.toml", "src", "main.py")
     }
+    PATTERN_INDEX = build_pattern_index(REPO_TYPES)
 
     def __init__(self, 
                  communication_paths: List[Tuple[str, str]],
@@ -27,24 +91,30 @@ class Agency:
                  max_prompt_tokens: int = 4000):
         """Initialize the agency with communication paths and settings."""
         self.paths = set(communication_paths)
-        self.shared_instructions = self._load_instructions(shared_instructions)
+        self.instructions_path = shared_instructions
+        self.shared_instructions = ""
         self.temperature = temperature
         self.max_tokens = max_prompt_tokens
         self.agents = {}
+        self._repo_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REPOS)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._running: set = set()  # repositories currently holding a concurrency slot
+        self._finished_jobs: deque = deque()
         
     async def initialize(self):
         """Initialize the agency and its services."""
         logger.info("Initializing agency")
+        self.shared_instructions = await self._load_instructions(self.instructions_path)
         await event_bus.start()
         await self._initialize_agents()
         
-    def _load_instructions(self, path: str) -> str:
+    async def _load_instructions(self, path: str) -> str:
         """Load shared instructions from file."""
         if not path:
             return ""
         try:    
-            with open(path, 'r') as f:
-                return f.read()
+            return await asyncio.to_thread(_read_instructions, path)
         except Exception as e:
             logger.error(f"Error loading instructions: {e}")
             return ""
@@ -61,22 +131,116 @@ class Agency:
             "review": ReviewAgent(self)
         }
         
-        for agent in self.agents.values():
-            await agent.initialize()
+        try:
+            await _run_all(*(agent.initialize() for agent in self.agents.values()))
+        except Exception as e:
+            logger.error(f"Error initializing agents: {str(e)}")
+            await self.cleanup()
+            raise
 
     def _detect_repo_type(self, repo_path: str) -> str:
         """Detect repository type based on file structure."""
-        for repo_type, patterns in self.REPO_TYPES.items():
-            matches = 0
-            for pattern in patterns:
-                if Path(repo_path, pattern).exists():
-                    matches += 1
-            if matches >= 2:  # Require at least 2 matching patterns
+        try:
+            dir_mtime = os.stat(repo_path).st_mtime_ns
+        except OSError:
+            return "unknown"
+        return self._match_repo_type(repo_path, dir_mtime)
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _match_repo_type(cls, repo_path: str, dir_mtime: int) -> str:
+        """Match repository patterns, cached per path and directory mtime."""
+        repo_type = _load_cached_repo_type(repo_path, dir_mtime)
+        if repo_type is None:
+            repo_type = cls._scan_repo_type(repo_path)
+            _store_cached_repo_type(repo_path, dir_mtime, repo_type)
+        return repo_type
+
+    @classmethod
+    def _scan_repo_type(cls, repo_path: str) -> str:
+        """Detect repository type from the repository's top-level entries."""
+        try:
+            detected = match_repo_patterns(repo_path, cls.PATTERN_INDEX)
+        except OSError:
+            return "unknown"
+
+        for repo_type in cls.REPO_TYPES:
+            if len(detected.get(repo_type, ())) >= 2:  # Require at least 2 matching patterns
                 return repo_type
         return "unknown"
 
     async def process_repository(self, repo_url: str) -> Dict[str, Any]:
-        """Process repository and generate documentation."""
+        """Process repository and generate documentation.
+
+        Concurrent calls for the same repository share a single pipeline run.
+        """
+        task = self._inflight.get(repo_url)
+        if task is None:
+            task = asyncio.create_task(self._process_repository_bounded(repo_url))
+            self._inflight[repo_url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(repo_url, None))
+        else:
+            logger.info(f"Joining in-flight processing of {repo_url}")
+        return await asyncio.shield(task)
+
+    async def _process_repository_bounded(self, repo_url: str) -> Dict[str, Any]:
+        """Process a repository once a concurrency slot is available."""
+        async with self._repo_semaphore:
+            self._running.add(repo_url)
+            for job in self._jobs.values():
+                if job["repo_url"] == repo_url and job["status"] == "queued":
+                    job["status"] = "running"
+            try:
+                return await self._process_repository(repo_url)
+            finally:
+                self._running.discard(repo_url)
+
+    async def submit_repository(self, repo_url: str) -> str:
+        """Queue a repository for background processing and return its task id."""
+        task_id = str(uuid.uuid4())
+        self._jobs[task_id] = {"status": "queued", "repo_url": repo_url, "result": None}
+        task = asyncio.create_task(self._run_job(task_id, repo_url))
+        task.add_done_callback(functools.partial(self._finish_job, task_id))
+        self._jobs[task_id]["task"] = task
+        logger.info(f"Queued repository {repo_url} as task {task_id}")
+        return task_id
+
+    def get_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get the status and result of a submitted repository task."""
+        job = self._jobs.get(task_id)
+        if job is None:
+            return None
+        return {key: value for key, value in job.items() if key != "task"}
+
+    async def _run_job(self, task_id: str, repo_url: str) -> None:
+        """Run a submitted repository task and record its status transitions."""
+        job = self._jobs[task_id]
+        # Jobs turn "running" once their run holds a concurrency slot; one
+        # joining a run that already holds it is running straight away
+        if repo_url in self._running:
+            job["status"] = "running"
+        # Shares any in-flight run for the same repository and its concurrency slot
+        result = await self.process_repository(repo_url)
+        job["status"] = "completed" if result.get("status") == "success" else "failed"
+        job["result"] = result
+
+    def _finish_job(self, task_id: str, task: asyncio.Task) -> None:
+        """Record how a background job ended and evict the oldest finished jobs."""
+        job = self._jobs.get(task_id)
+        if job is None:
+            return
+        if task.cancelled():
+            job["status"] = "cancelled"
+        elif task.exception() is not None:
+            job["status"] = "failed"
+            job["result"] = {"status": "error", "error": str(task.exception())}
+            
+        self._finished_jobs.append(task_id)
+        while len(self._finished_jobs) > FINISHED_JOBS_LIMIT:
+            self._jobs.pop(self._finished_jobs.popleft(), None)
+
+    async def _process_repository(self, repo_url: str) -> Dict[str, Any]:
+        """Run the clone, documentation, review and pull request pipeline."""
         logger.info(f"Processing repository: {repo_url}")
         
         try:
@@ -87,16 +251,26 @@ class Agency:
             
             repo_path = clone_result["data"]["local_path"]
             
-            # Detect repository type
-            repo_type = self._detect_repo_type(repo_path)
-            logger.info(f"Detected repository type: {repo_type}")
-            
-            # Generate documentation based on repository type
-            doc_result = await self.agents["documentation"].generate_documentation(
-                repo_path=repo_path,
-                repo_type=repo_type,
-                repo_url=repo_url
+            # Warm the page cache for repository analysis in the background
+            prewarm = asyncio.create_task(
+                self.agents["documentation"].repo_analyzer.prewarm(repo_path)
             )
+            try:
+                # Detect repository type
+                repo_type = await asyncio.to_thread(self._detect_repo_type, repo_path)
+                logger.info(f"Detected repository type: {repo_type}")
+                
+                # Generate documentation based on repository type
+                doc_result = await self.agents["documentation"].generate_documentation(
+                    repo_path=repo_path,
+                    repo_type=repo_type,
+                    repo_url=repo_url
+                )
+            finally:
+                # Stop prewarming however generation ended, and retrieve any
+                # error it raised so it is not reported as never retrieved
+                prewarm.cancel()
+                prewarm.add_done_callback(lambda task: task.cancelled() or task.exception())
             
             if doc_result.get("status") != "success":
                 raise RuntimeError(f"Documentation generation failed: {doc_result.get('error')}")
@@ -137,6 +311,18 @@ class Agency:
     async def cleanup(self):
         """Cleanup agency resources."""
         logger.info("Cleaning up agency resources")
-        for agent in self.agents.values():
-            await agent.cleanup()
+        for job in self._jobs.values():
+            if not job["task"].done():
+                job["task"].cancel()
+        # Pipeline runs are shielded from their callers, so stop them directly
+        for task in list(self._inflight.values()):
+            task.cancel()
+        # Every agent gets to clean up even if another one fails
+        results = await asyncio.gather(
+            *(agent.cleanup() for agent in self.agents.values()),
+            return_exceptions=True
+        )
+        for name, result in zip(self.agents, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error cleaning up {name} agent: {str(result)}")
         await event_bus.stop()
\ No newline at end of file
@@ -1,11 +1,13 @@
 """Documentation Agent for analyzing repositories and generating documentation."""
-from typing import Dict, List, Optional, Any
-from pathlib import Path
-from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+import asyncio
+from collections import OrderedDict
 
 from core.services.logging import setup_logger
 from core.services.event_bus import event_bus
+from core.services.event_bus.event_bus import Event
 from core.services.cache import cache_manager
+from core.settings import LLM_CONCURRENCY
 
 from .tools.repository_analyzer import RepositoryAnalyzer
 from .tools.standard_selector import StandardSelector
@@ -15,10 +17,20 @@ from .tools.feedback_processor import FeedbackProcessor
 from .tools.content_reviser import ContentReviser
 
 from .schemas.generated_content import GeneratedContent
-from .schemas.documentation_standard import DocumentationStandard
 
 logger = setup_logger(__name__)
 
+EVENT_SOURCE = "documentation_agent"
+EVT_SUBMITTED = "documentation.submitted"
+EVT_COMPLETED = "documentation.completed"
+EVT_REJECTED = "documentation.rejected"
+EVT_MAX_ITERATIONS = "documentation.max_iterations"
+EVT_ERROR = "documentation.error"
+
+RECENT_DOCUMENTS_LIMIT = 16  # documentation versions kept in the agent's local cache
+REVISION_BATCH_SIZE = 4  # buffered revisions that trigger an immediate flush
+REVISION_FLUSH_DELAY = 0  # seconds to wait for more feedback; 0 batches only feedback already queued
+
 class DocumentationAgent:
     """Agent responsible for documentation generation and management."""
 
@@ -39,6 +51,10 @@ class DocumentationAgent:
         self.current_repo: Optional[str] = None
         self.current_iteration: int = 0
         self.max_iterations: int = 5
+        self._recent_documents: "OrderedDict[str, GeneratedContent]" = OrderedDict()
+        self._revision_buffer: List[Tuple[GeneratedContent, Dict[str, List[Dict]], int]] = []
+        self._revision_flush_task: Optional[asyncio.Task] = None
+        self._llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
 
     async def initialize(self) -> None:
         """Initialize the agent and its resources."""
@@ -49,8 +65,7 @@ class DocumentationAgent:
             event_bus.subscribe("review.approved", self._handle_approval)
             event_bus.subscribe("review.rejected", self._handle_rejection)
             
-            # Load standards and templates
-            await self.standard_selector.load_standards()
+            # Load templates; standards are loaded per repository type on first use
             await self.template_manager.load_templates()
             
             logger.info("Documentation Agent initialized successfully")
@@ -79,26 +94,35 @@ class DocumentationAgent:
             self.current_repo = repo_path
             self.current_iteration = 0
             
-            # Analyze repository
-            repo_analysis = await self.repo_analyzer.analyze_repository(repo_path)
-            detected_type = repo_type or repo_analysis.repository_type
-            
-            # Select documentation standard
-            standard = await self.standard_selector.select_standard(
-                detected_type,
-                custom_rules
-            )
+            if repo_type:
+                # Type is known up front, so select the standard while analyzing
+                repo_analysis, standard = await asyncio.gather(
+                    self.repo_analyzer.analyze_repository(repo_path),
+                    self.standard_selector.select_standard(repo_type, custom_rules)
+                )
+                detected_type = repo_type
+            else:
+                # Analyze repository
+                repo_analysis = await self.repo_analyzer.analyze_repository(repo_path)
+                detected_type = repo_analysis.repository_type
+                
+                # Select documentation standard
+                standard = await self.standard_selector.select_standard(
+                    detected_type,
+                    custom_rules
+                )
             
             # Validate standard can be applied
             if not await self.standard_selector.validate_standard(standard, repo_path):
                 raise ValueError(f"Selected standard cannot be applied to repository: {repo_path}")
             
             # Generate initial documentation
-            documentation = await self.content_generator.generate_documentation(
-                repository_path=repo_path,
-                repository_type=detected_type,
-                standard=standard
-            )
+            async with self._llm_semaphore:
+                documentation = await self.content_generator.generate_documentation(
+                    repository_path=repo_path,
+                    repository_type=detected_type,
+                    standard=standard
+                )
             
             # Submit for review
             await self._submit_for_review(documentation)
@@ -131,7 +155,7 @@ class DocumentationAgent:
                 
             # Get current documentation
             documentation_id = event['data'].get('documentation_id')
-            documentation = self.cache.get(f"documentation_{documentation_id}")
+            documentation = self._get_documentation(documentation_id)
             
             if not documentation:
                 raise ValueError(f"Documentation not found: {documentation_id}")
@@ -142,48 +166,77 @@ class DocumentationAgent:
                 documentation
             )
             
-            # Revise content
-            revised_docs = await self.content_reviser.revise_content(
-                documentation,
-                feedback,
-                self.current_iteration
-            )
-            
-            # Submit revised documentation for review
-            await self._submit_for_review(revised_docs)
+            # Queue the revision with the iteration it answers; buffered
+            # revisions are applied together
+            self._revision_buffer.append((documentation, feedback, self.current_iteration))
+            if len(self._revision_buffer) >= REVISION_BATCH_SIZE:
+                await self._flush_revisions()
+            elif self._revision_flush_task is None:
+                self._revision_flush_task = asyncio.create_task(self._flush_revisions_later())
             
         except Exception as e:
             logger.error(f"Error handling feedback: {str(e)}")
-            await event_bus.publish({
-                "type": "documentation.error",
-                "source": "documentation_agent",
-                "data": {
-                    "error": str(e),
-                    "documentation_id": event['data'].get('documentation_id')
-                }
+            await self._publish_event(EVT_ERROR, {
+                "error": str(e),
+                "documentation_id": event['data'].get('documentation_id')
             })
 
+    async def _flush_revisions(self) -> None:
+        """Revise all buffered documentation and submit the results for review."""
+        flush_task = self._revision_flush_task
+        if flush_task is not None and flush_task is not asyncio.current_task():
+            flush_task.cancel()
+        self._revision_flush_task = None
+        
+        batch, self._revision_buffer = self._revision_buffer, []
+        if not batch:
+            return
+            
+        try:
+            async with self._llm_semaphore:
+                revised = await self.content_reviser.revise_content_batch(batch)
+        except Exception as e:
+            logger.error(f"Error revising documentation: {str(e)}")
+            # Every documentation in the batch is waiting on a reply
+            for documentation, _, _ in batch:
+                await self._publish_event(EVT_ERROR, {
+                    "error": str(e),
+                    "documentation_id": documentation.documentation_version
+                })
+            return
+            
+        for (documentation, _, iteration), revised_docs in zip(batch, revised):
+            try:
+                await self._submit_for_review(revised_docs, iteration)
+            except Exception as e:
+                logger.error(f"Error submitting revised documentation: {str(e)}")
+                await self._publish_event(EVT_ERROR, {
+                    "error": str(e),
+                    "documentation_id": documentation.documentation_version
+                })
+
+    async def _flush_revisions_later(self) -> None:
+        """Flush buffered revisions once the batching window closes."""
+        await asyncio.sleep(REVISION_FLUSH_DELAY)
+        await self._flush_revisions()
+
     async def _handle_approval(self, event: Dict) -> None:
         """Handle documentation approval."""
         try:
             documentation_id = event['data'].get('documentation_id')
             
             # Get final documentation
-            documentation = self.cache.get(f"documentation_{documentation_id}")
+            documentation = self._get_documentation(documentation_id)
             
             if not documentation:
                 raise ValueError(f"Documentation not found: {documentation_id}")
                 
             # Notify success
-            await event_bus.publish({
-                "type": "documentation.completed",
-                "source": "documentation_agent",
-                "data": {
-                    "documentation_id": documentation_id,
-                    "repository": self.current_repo,
-                    "iterations": self.current_iteration,
-                    "documentation": documentation.dict()
-                }
+            await self._publish_event(EVT_COMPLETED, {
+                "documentation_id": documentation_id,
+                "repository": self.current_repo,
+                "iterations": self.current_iteration,
+                "documentation": documentation.to_dict()
             })
             
             # Clear current state
@@ -202,15 +255,11 @@ class DocumentationAgent:
             logger.warning(f"Documentation rejected: {reason}")
             
             # Notify rejection
-            await event_bus.publish({
-                "type": "documentation.rejected",
-                "source": "documentation_agent",
-                "data": {
-                    "documentation_id": documentation_id,
-                    "repository": self.current_repo,
-                    "reason": reason,
-                    "iterations": self.current_iteration
-                }
+            await self._publish_event(EVT_REJECTED, {
+                "documentation_id": documentation_id,
+                "repository": self.current_repo,
+                "reason": reason,
+                "iterations": self.current_iteration
             })
             
             # Clear current state
@@ -220,43 +269,55 @@ class DocumentationAgent:
         except Exception as e:
             logger.error(f"Error handling rejection: {str(e)}")
 
-    async def _submit_for_review(self, documentation: GeneratedContent) -> None:
-        """Submit documentation for review."""
-        try:
-            # Cache current documentation
-            cache_key = f"documentation_{documentation.documentation_version}"
-            self.cache.set(cache_key, documentation)
-            
-            # Submit for review
-            await event_bus.publish({
-                "type": "documentation.submitted",
-                "source": "documentation_agent",
-                "data": {
-                    "documentation_id": documentation.documentation_version,
-                    "repository": self.current_repo,
-                    "iteration": self.current_iteration,
-                    "documentation": documentation.dict()
-                }
-            })
-            
-        except Exception as e:
-            logger.error(f"Error submitting for review: {str(e)}")
-            raise
+    async def _submit_for_review(
+        self,
+        documentation: GeneratedContent,
+        iteration: Optional[int] = None
+    ) -> None:
+        """Submit documentation for review, stamped with the iteration it answers."""
+        # Errors propagate to the caller, which already logs them
+        self._cache_documentation(documentation)
+        
+        # Dumping a large package is CPU-bound; keep it off the event loop
+        payload = await asyncio.to_thread(documentation.to_dict)
+        
+        await self._publish_event(EVT_SUBMITTED, {
+            "documentation_id": documentation.documentation_version,
+            "repository": self.current_repo,
+            "iteration": self.current_iteration if iteration is None else iteration,
+            "documentation": payload
+        })
 
     async def _notify_max_iterations_reached(self) -> None:
         """Notify that maximum iterations have been reached."""
         try:
-            await event_bus.publish({
-                "type": "documentation.max_iterations",
-                "source": "documentation_agent",
-                "data": {
-                    "repository": self.current_repo,
-                    "iterations": self.current_iteration
-                }
+            await self._publish_event(EVT_MAX_ITERATIONS, {
+                "repository": self.current_repo,
+                "iterations": self.current_iteration
             })
         except Exception as e:
             logger.error(f"Error sending max iterations notification: {str(e)}")
 
+    def _cache_documentation(self, documentation: GeneratedContent) -> None:
+        """Store documentation in the local cache and the shared cache manager."""
+        documentation_id = documentation.documentation_version
+        self._recent_documents[documentation_id] = documentation
+        self._recent_documents.move_to_end(documentation_id)
+        if len(self._recent_documents) > RECENT_DOCUMENTS_LIMIT:
+            self._recent_documents.popitem(last=False)
+        self.cache.set(f"documentation_{documentation_id}", documentation)
+
+    def _get_documentation(self, documentation_id: str) -> Optional[GeneratedContent]:
+        """Get documentation from the local cache, falling back to the cache manager."""
+        documentation = self._recent_documents.get(documentation_id)
+        if documentation is None:
+            documentation = self.cache.get(f"documentation_{documentation_id}")
+        return documentation
+
+    async def _publish_event(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Publish an event from this agent on the event bus."""
+        await event_bus.publish(Event(event_type, EVENT_SOURCE, data))
+
     async def cleanup(self) -> None:
         """Cleanup agent resources."""
         try:
@@ -264,8 +325,15 @@ class DocumentationAgent:
             self.current_repo = None
             self.current_iteration = 0
             
-            # Clear caches if needed
-            # Any other cleanup needed
+            # Drop pending revisions
+            if self._revision_flush_task is not None:
+                self._revision_flush_task.cancel()
+                self._revision_flush_task = None
+            self._revision_buffer.clear()
+            
+            # Clear caches
+            self._recent_documents.clear()
+            self.content_reviser.clear_cache()
             
             logger.info("Documentation Agent cleanup completed")
         except Exception as e:
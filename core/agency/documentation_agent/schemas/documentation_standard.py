@@ -1,17 +1,45 @@
 """Schema for documentation standards and guidelines."""
-from typing import Dict, List, Optional
-from pydantic import BaseModel, Field
+import sys
+from typing import Dict, FrozenSet, Iterable, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, field_serializer, field_validator
+
+
+def _intern_patterns(patterns: Iterable[str]) -> FrozenSet[str]:
+    """Intern pattern strings so rules and templates share one copy of each."""
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return frozenset(sys.intern(str(pattern)) for pattern in patterns)
+
+
+def _sorted_patterns(patterns: FrozenSet[str]) -> List[str]:
+    """Serialize a pattern set as a stable, YAML-friendly list."""
+    return sorted(patterns)
 
 class DocumentationRule(BaseModel):
     """Individual documentation rule or guideline."""
+    model_config = ConfigDict(frozen=True)
+
     rule_id: str = Field(..., description="Unique identifier for the rule")
     description: str = Field(..., description="Description of the rule")
     required: bool = Field(default=True, description="Whether this rule is required")
-    applies_to: List[str] = Field(..., description="File types/patterns this rule applies to")
+    applies_to: FrozenSet[str] = Field(..., description="File types/patterns this rule applies to")
     example: Optional[str] = Field(None, description="Example of correct documentation")
 
+    @field_validator("applies_to", mode="before")
+    @classmethod
+    def intern_applies_to(cls, value: Iterable[str]) -> FrozenSet[str]:
+        """Store patterns as an interned set for constant-time membership checks."""
+        return _intern_patterns(value)
+
+    @field_serializer("applies_to")
+    def serialize_applies_to(self, value: FrozenSet[str]) -> List[str]:
+        """Dump patterns as a sorted list."""
+        return _sorted_patterns(value)
+
 class TemplateVariable(BaseModel):
     """Variable that can be used in documentation templates."""
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(..., description="Variable name")
     description: str = Field(..., description="Variable description")
     required: bool = Field(default=True, description="Whether this variable is required")
@@ -19,13 +47,26 @@ class TemplateVariable(BaseModel):
 
 class DocumentationTemplate(BaseModel):
     """Template for generating documentation."""
+    model_config = ConfigDict(frozen=True)
+
     template_id: str = Field(..., description="Unique identifier for the template")
     name: str = Field(..., description="Template name")
     description: str = Field(..., description="Template description")
     content: str = Field(..., description="Template content with variables")
     variables: List[TemplateVariable] = Field(..., description="Template variables")
     file_name: str = Field(..., description="Target file name (can include variables)")
-    applies_to: List[str] = Field(..., description="Repository types this template applies to")
+    applies_to: FrozenSet[str] = Field(..., description="Repository types this template applies to")
+
+    @field_validator("applies_to", mode="before")
+    @classmethod
+    def intern_applies_to(cls, value: Iterable[str]) -> FrozenSet[str]:
+        """Store patterns as an interned set for constant-time membership checks."""
+        return _intern_patterns(value)
+
+    @field_serializer("applies_to")
+    def serialize_applies_to(self, value: FrozenSet[str]) -> List[str]:
+        """Dump patterns as a sorted list."""
+        return _sorted_patterns(value)
 
 class DocumentationStandard(BaseModel):
     """Complete documentation standard for a repository type."""
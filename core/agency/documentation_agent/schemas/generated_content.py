@@ -1,17 +1,21 @@
 """Schema for generated documentation content."""
-from typing import Dict, List, Optional
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from datetime import datetime
 
-class DocumentSection(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class DocumentSection:
     """Section of a documentation file."""
-    title: str = Field(..., description="Section title")
-    content: str = Field(..., description="Section content")
-    level: int = Field(1, description="Header level (1-6)")
-    order: int = Field(..., description="Order in the document")
+    title: str  # Section title
+    content: str  # Section content
+    level: int = 1  # Header level (1-6)
+    order: int  # Order in the document
 
 class DocumentMetadata(BaseModel):
     """Metadata for a documentation file."""
+    model_config = ConfigDict(frozen=True)
+
     generated_at: datetime = Field(default_factory=datetime.now)
     generator_version: str = Field(..., description="Version of the documentation generator")
     template_id: Optional[str] = Field(None, description="ID of template used")
@@ -36,3 +40,19 @@ class GeneratedContent(BaseModel):
     documentation_version: str = Field(..., description="Documentation version")
     complete: bool = Field(False, description="Whether documentation is complete")
     requires_review: bool = Field(True, description="Whether package needs review")
+    _cached_dict: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the package, reusing the dump until it is invalidated.
+        
+        Each caller gets its own top-level dict; nested values are shared
+        with the cached dump and must be treated as read-only.
+        """
+        if self._cached_dict is None:
+            self._cached_dict = self.model_dump()
+        return dict(self._cached_dict)
+
+    def invalidate_cache(self) -> None:
+        """Drop the cached serialization after the package is modified."""
+        self._cached_dict = None
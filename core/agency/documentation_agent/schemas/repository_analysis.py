@@ -1,16 +1,20 @@
 """Schema for repository analysis results."""
+from dataclasses import dataclass
 from typing import Dict, List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
-class FileInfo(BaseModel):
+@dataclass(slots=True, frozen=True)
+class FileInfo:
     """Information about a specific file in the repository."""
-    path: str = Field(..., description="Path to the file relative to repository root")
-    type: str = Field(..., description="File type/extension")
-    size: int = Field(..., description="File size in bytes")
-    last_modified: str = Field(..., description="Last modification timestamp")
+    path: str  # Path to the file relative to repository root
+    type: str  # File type/extension
+    size: int  # File size in bytes
+    last_modified: str  # Last modification timestamp
 
 class DirectoryInfo(BaseModel):
     """Information about a directory in the repository."""
+    model_config = ConfigDict(frozen=True)
+
     path: str = Field(..., description="Path to directory relative to repository root")
     files: List[FileInfo] = Field(default_factory=list, description="Files in this directory")
     subdirectories: List[str] = Field(default_factory=list, description="Subdirectory names")
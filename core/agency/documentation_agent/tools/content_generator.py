@@ -1,8 +1,9 @@
 """Tool for generating documentation content."""
-from typing import Dict, List, Optional
-from pathlib import Path
-import logging
+from typing import Any, Dict, List, Optional
+import asyncio
+import re
 from datetime import datetime
+from string import Template
 from core.services.logging import setup_logger
 from core.services.cache import cache_manager
 from ..schemas.documentation_standard import DocumentationStandard, DocumentationTemplate
@@ -15,6 +16,22 @@ from ..schemas.generated_content import (
 
 logger = setup_logger(__name__)
 
+# A "## " heading line and everything up to the next one
+_SECTION_RE = re.compile(r"^## (?P<title>[^\n]*)\n?(?P<body>.*?)(?=^## |\Z)", re.MULTILINE | re.DOTALL)
+
+def _iter_raw_sections(content: str):
+    """Yield (title, body) pairs for template content split on "## " headings."""
+    first = _SECTION_RE.search(content)
+    preamble = content[:first.start()] if first else content
+    if preamble.strip():
+        # Text before the first heading is titled by its own first line
+        title, _, body = preamble.partition("\n")
+        yield title.strip(), body.strip()
+    if first is None:
+        return
+    for match in _SECTION_RE.finditer(content, first.start()):
+        yield match.group("title").strip(), match.group("body").strip()
+
 class ContentGenerator:
     """Generates documentation content based on templates and standards."""
 
@@ -34,17 +51,41 @@ class ContentGenerator:
         try:
             logger.info(f"Generating documentation for {repository_path}")
             files: Dict[str, DocumentFile] = {}
+            # One timestamp for the whole package and every file in it
+            generated_at = datetime.now()
+            
+            # Generate each required documentation file concurrently
+            templates = [
+                template for template in standard.templates
+                if repository_type in template.applies_to
+            ]
+            
+            # Extract repository variables once for every template
+            repo_vars = await self._extract_repo_variables(
+                repository_path,
+                [var for template in templates for var in template.variables]
+            )
+            # Custom and repository variables are shared; only defaults vary per template
+            base_vars = {**(variables or {}), **repo_vars}
+            # Metadata shared by every file; only the template id differs
+            base_metadata = {
+                "generator_version": self._version,
+                "repository_type": standard.repository_type,
+                "documentation_standard": standard.name,
+                "generated_at": generated_at
+            }
             
-            # Generate each required documentation file
-            for template in standard.templates:
-                if repository_type in template.applies_to:
-                    doc_file = await self._generate_file(
-                        template=template,
-                        repo_path=repository_path,
-                        variables=variables,
-                        standard=standard
-                    )
-                    files[template.file_name] = doc_file
+            doc_files = await asyncio.gather(*(
+                self._generate_file(
+                    template=template,
+                    repo_path=repository_path,
+                    base_vars=base_vars,
+                    base_metadata=base_metadata
+                )
+                for template in templates
+            ))
+            for template, doc_file in zip(templates, doc_files):
+                files[template.file_name] = doc_file
 
             # Create the complete documentation package
             content = GeneratedContent(
@@ -52,6 +93,7 @@ class ContentGenerator:
                 repository_type=repository_type,
                 files=files,
                 documentation_version=self._version,
+                generation_timestamp=generated_at,
                 complete=await self._validate_completeness(files, standard),
                 requires_review=True
             )
@@ -66,13 +108,13 @@ class ContentGenerator:
         self,
         template: DocumentationTemplate,
         repo_path: str,
-        variables: Optional[Dict[str, str]],
-        standard: DocumentationStandard
+        base_vars: Dict[str, str],
+        base_metadata: Dict[str, Any]
     ) -> DocumentFile:
         """Generate a single documentation file from a template."""
         try:
             # Prepare template variables
-            vars_dict = await self._prepare_variables(template, repo_path, variables)
+            vars_dict = await self._prepare_variables(template, base_vars)
             
             # Generate sections
             sections = await self._generate_sections(template, vars_dict, repo_path)
@@ -85,10 +127,8 @@ class ContentGenerator:
                 content=content,
                 sections=sections,
                 metadata=DocumentMetadata(
-                    generator_version=self._version,
                     template_id=template.template_id,
-                    repository_type=standard.repository_type,
-                    documentation_standard=standard.name
+                    **base_metadata
                 ),
                 requires_review=True
             )
@@ -100,24 +140,12 @@ class ContentGenerator:
     async def _prepare_variables(
         self,
         template: DocumentationTemplate,
-        repo_path: str,
-        custom_vars: Optional[Dict[str, str]]
+        base_vars: Dict[str, str]
     ) -> Dict[str, str]:
         """Prepare variables for template generation."""
-        variables = {}
-        
-        # Add default values
-        for var in template.variables:
-            if var.default:
-                variables[var.name] = var.default
-        
-        # Add custom variables
-        if custom_vars:
-            variables.update(custom_vars)
-            
-        # Extract repo-specific variables
-        repo_vars = await self._extract_repo_variables(repo_path, template.variables)
-        variables.update(repo_vars)
+        # Template defaults, overridden by custom and repo-specific variables
+        variables = {var.name: var.default for var in template.variables if var.default}
+        variables.update(base_vars)
         
         return variables
 
@@ -143,20 +171,9 @@ class ContentGenerator:
         
         # Parse template content into sections
         # This is a simplified implementation
-        raw_sections = template.content.split("## ")
-        
-        for raw_section in raw_sections:
-            if not raw_section.strip():
-                continue
-                
-            # Extract title and content
-            lines = raw_section.splitlines()
-            title = lines[0].strip()
-            content = "\n".join(lines[1:]).strip()
-            
-            # Apply variables
-            for var_name, var_value in variables.items():
-                content = content.replace(f"${var_name}", str(var_value))
+        for title, content in _iter_raw_sections(template.content):
+            # Apply variables in one pass, leaving unknown placeholders as-is
+            content = Template(content).safe_substitute(variables)
             
             sections.append(DocumentSection(
                 title=title,
@@ -175,13 +192,11 @@ class ContentGenerator:
     ) -> bool:
         """Validate if generated documentation is complete."""
         # Check all required files are present
-        for required_file in standard.required_files:
-            if required_file not in files:
-                return False
-                
-        # Check all files have content
-        for doc_file in files.values():
-            if not doc_file.content.strip():
-                return False
+        if not set(standard.required_files).issubset(files):
+            return False
                 
-        return True
\ No newline at end of file
+        # Check all files have content; isspace() stops at the first visible character
+        return not any(
+            not doc_file.content or doc_file.content.isspace()
+            for doc_file in files.values()
+        )
\ No newline at end of file
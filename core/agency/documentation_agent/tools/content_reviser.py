@@ -1,21 +1,137 @@
 """Tool for revising documentation content based on feedback."""
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import asyncio
+import functools
+import hashlib
+import heapq
+from itertools import groupby
+import json
+from collections import OrderedDict, defaultdict, deque
 from pathlib import Path
-import difflib
+from datetime import datetime
+from rapidfuzz import fuzz, process
+try:
+    from cydifflib import SequenceMatcher
+except ImportError:  # cydifflib is optional; difflib has the same API
+    from difflib import SequenceMatcher
 from core.services.logging import setup_logger
 from core.services.cache import cache_manager
 from ..schemas.generated_content import GeneratedContent, DocumentFile
 
 logger = setup_logger(__name__)
 
+REVISION_CACHE_SIZE = 64  # revised documents kept for repeated feedback
+VOLATILE_FEEDBACK_KEYS = frozenset({'processed_at'})  # ignored when fingerprinting feedback
+REVISION_HISTORY_LIMIT = 50  # revisions kept per file
+CONTEXT_RUN_MIN = 4  # consecutive context lines collapsed into one run record
+
+def _collapse_context_runs(changes: List[Dict]) -> List[Dict]:
+    """Replace long runs of unchanged context lines with a single run record."""
+    collapsed = []
+    for change_type, group in groupby(changes, key=lambda change: change['type']):
+        run = list(group)
+        if change_type == 'context' and len(run) >= CONTEXT_RUN_MIN:
+            collapsed.append({
+                'type': 'context_run',
+                'count': len(run),
+                'content': run[0]['content']
+            })
+        else:
+            collapsed.extend(run)
+    return collapsed
+
+LINE_INDEX_CACHE_SIZE = 8  # documents whose line offsets are kept between edits
+
+@functools.lru_cache(maxsize=LINE_INDEX_CACHE_SIZE)
+def _line_starts(content: str) -> Tuple[int, ...]:
+    """Get the offset at which each line of content starts."""
+    starts = [0]
+    pos = content.find('\n')
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = content.find('\n', pos + 1)
+    return tuple(starts)
+
+def _line_bounds(content: str, line_num: int) -> Optional[Tuple[int, int]]:
+    """Get the (start, end) offsets of a line in content, without its line break."""
+    starts = _line_starts(content)
+    if not 0 <= line_num < len(starts) or starts[line_num] >= len(content):
+        return None
+    start = starts[line_num]
+    end = starts[line_num + 1] - 1 if line_num + 1 < len(starts) else len(content)
+    if end > start and content[end - 1] == '\r':
+        end -= 1
+    return start, end
+
+BLOCK_MATCH_CACHE_SIZE = 256  # (content, suggestion) digests whose best block is remembered
+BIGRAM_PREFILTER_MIN_BLOCKS = 64  # below this, every block is scored exactly
+BIGRAM_PREFILTER_TOP_K = 16  # blocks kept for exact scoring after the bigram prefilter
+BLOCK_BIGRAM_CACHE_SIZE = 8  # documents whose per-block bigram sets are kept
+
+def _bigrams(text: str) -> FrozenSet[str]:
+    """Get the set of character bigrams in text."""
+    return frozenset(text[i:i + 2] for i in range(len(text) - 1))
+
+@functools.lru_cache(maxsize=BLOCK_BIGRAM_CACHE_SIZE)
+def _block_bigrams(content: str) -> Tuple[FrozenSet[str], ...]:
+    """Get the bigram set of each paragraph block of content."""
+    return tuple(_bigrams(block) for block in content.split('\n\n'))
+
+# Best block per (content digest, suggestion digest); digests keep
+# whole documents from being pinned in memory by the cache
+_BLOCK_MATCH_CACHE: "OrderedDict[Tuple[bytes, bytes], Optional[int]]" = OrderedDict()
+
+def _digest(text: str) -> bytes:
+    """Get a short digest identifying text."""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+def _best_block_index(content: str, text: str) -> Optional[int]:
+    """Find the paragraph block of content that best matches text, memoized by digest."""
+    key = (_digest(content), _digest(text))
+    if key in _BLOCK_MATCH_CACHE:
+        _BLOCK_MATCH_CACHE.move_to_end(key)
+        return _BLOCK_MATCH_CACHE[key]
+        
+    index = _match_block(content, text)
+    _BLOCK_MATCH_CACHE[key] = index
+    if len(_BLOCK_MATCH_CACHE) > BLOCK_MATCH_CACHE_SIZE:
+        _BLOCK_MATCH_CACHE.popitem(last=False)
+    return index
+
+def _match_block(content: str, text: str) -> Optional[int]:
+    """Find the paragraph block of content that best matches text."""
+    blocks = content.split('\n\n')
+    choices = blocks
+    
+    if len(blocks) > BIGRAM_PREFILTER_MIN_BLOCKS:
+        # Only score the blocks sharing the most bigrams (Dice coefficient)
+        query = _bigrams(text)
+        block_bigrams = _block_bigrams(content)
+        
+        def dice(index: int) -> float:
+            total = len(query) + len(block_bigrams[index])
+            return 2 * len(query & block_bigrams[index]) / total if total else 0.0
+            
+        candidates = heapq.nlargest(BIGRAM_PREFILTER_TOP_K, range(len(blocks)), key=dice)
+        choices = {index: blocks[index] for index in candidates}
+        
+    # Closest block by similarity ratio, same 0.3 cutoff difflib used;
+    # the third element is the list index or dict key of the match
+    match = process.extractOne(text, choices, scorer=fuzz.ratio, score_cutoff=30)
+    if match:
+        return match[2]
+    return None
+
 class ContentReviser:
     """Revises documentation content based on feedback."""
 
     def __init__(self):
         """Initialize the content reviser."""
         self.cache = cache_manager
-        self.revision_history: Dict[str, List[Dict]] = {}
+        self.revision_history: Dict[str, deque] = defaultdict(
+            lambda: deque(maxlen=REVISION_HISTORY_LIMIT)
+        )
+        self._revision_cache: "OrderedDict[Tuple[str, int, str], GeneratedContent]" = OrderedDict()
 
     async def revise_content(
         self,
@@ -35,26 +151,42 @@ class ContentReviser:
             Updated documentation content
         """
         try:
-            # Create a copy of the documentation to modify
-            revised_docs = GeneratedContent(**documentation.dict())
+            # Identical feedback on the same content produces the same revision
+            cache_key = (
+                self._content_fingerprint(documentation),
+                iteration,
+                self._feedback_fingerprint(feedback)
+            )
+            cached = self._revision_cache.get(cache_key)
+            if cached is not None:
+                self._revision_cache.move_to_end(cache_key)
+                return cached
+                
+            # Shallow copy with its own files mapping; revised files are replaced,
+            # never mutated, so unchanged files can be shared with the original
+            revised_docs = documentation.model_copy(update={'files': dict(documentation.files)})
             
-            for file_path, feedback_items in feedback.items():
-                if file_path == 'general':
-                    # Handle general feedback that applies to all files
-                    await self._apply_general_feedback(revised_docs, feedback_items)
-                    continue
-                    
-                if file_path in revised_docs.files:
-                    # Revise specific file
-                    revised_file = await self._revise_file(
+            # Handle general feedback that applies to all files first, so
+            # file-specific feedback is applied on top of it
+            if 'general' in feedback:
+                await self._apply_general_feedback(revised_docs, feedback['general'])
+                
+            # Revise specific files
+            for file_path, items in feedback.items():
+                if file_path != 'general' and file_path in revised_docs.files:
+                    revised_docs.files[file_path] = await self._revise_file(
                         revised_docs.files[file_path],
-                        feedback_items,
+                        items,
                         iteration
                     )
-                    revised_docs.files[file_path] = revised_file
                     
             # Update metadata
             revised_docs.documentation_version = f"{documentation.documentation_version}-rev{iteration}"
+            revised_docs.invalidate_cache()
+            
+            self._revision_cache[cache_key] = revised_docs
+            if len(self._revision_cache) > REVISION_CACHE_SIZE:
+                self._revision_cache.popitem(last=False)
             
             return revised_docs
 
@@ -62,6 +194,50 @@ class ContentReviser:
             logger.error(f"Error revising content: {str(e)}")
             raise
 
+    async def revise_content_batch(
+        self,
+        batch: List[Tuple[GeneratedContent, Dict[str, List[Dict]], int]]
+    ) -> List[GeneratedContent]:
+        """
+        Revise several documentation packages concurrently.
+        
+        Args:
+            batch: Documentation, its organized feedback and its revision iteration
+            
+        Returns:
+            Revised documentation in the same order as the batch
+        """
+        return list(await asyncio.gather(*(
+            self.revise_content(documentation, feedback, iteration)
+            for documentation, feedback, iteration in batch
+        )))
+
+    def clear_cache(self) -> None:
+        """Drop all memoized revisions."""
+        self._revision_cache.clear()
+
+    @staticmethod
+    def _content_fingerprint(documentation: GeneratedContent) -> str:
+        """Hash the repository and every file's path and content."""
+        digest = hashlib.sha256(documentation.repository_url.encode())
+        for file_path in sorted(documentation.files):
+            digest.update(b'\0' + file_path.encode() + b'\0')
+            digest.update(documentation.files[file_path].content.encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _feedback_fingerprint(feedback: Dict[str, List[Dict]]) -> str:
+        """Hash organized feedback, ignoring per-run bookkeeping fields."""
+        stable = {
+            file_path: [
+                {k: v for k, v in item.items() if k not in VOLATILE_FEEDBACK_KEYS}
+                for item in items
+            ]
+            for file_path, items in feedback.items()
+        }
+        encoded = json.dumps(stable, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
     async def _revise_file(
         self,
         doc_file: DocumentFile,
@@ -70,29 +246,33 @@ class ContentReviser:
     ) -> DocumentFile:
         """Revise a single documentation file."""
         try:
-            # Create working copy
-            revised_file = DocumentFile(**doc_file.dict())
+            if not feedback_items:
+                return doc_file
+                
             original_content = doc_file.content
+            revised_content = original_content
             
             # Apply feedback items in priority order
             for item in feedback_items:
-                revised_content = await self._apply_feedback_item(
-                    revised_file.content,
+                revised_content = self._apply_feedback_item(
+                    revised_content,
                     item
                 )
-                revised_file.content = revised_content
                 
-            # Update sections if content changed
-            if revised_file.content != original_content:
-                revised_file.sections = await self._update_sections(
-                    revised_file.content
-                )
+            # Nothing to copy, re-section or track if no item changed the file
+            if revised_content == original_content:
+                return doc_file
+                
+            revised_file = doc_file.model_copy(update={
+                'content': revised_content,
+                'sections': self._update_sections(revised_content)
+            })
                 
             # Track revision
             await self._track_revision(
                 doc_file.path,
                 original_content,
-                revised_file.content,
+                revised_content,
                 feedback_items,
                 iteration
             )
@@ -110,21 +290,22 @@ class ContentReviser:
     ) -> None:
         """Apply general feedback that affects all documentation."""
         try:
-            for item in feedback_items:
-                for file_path in documentation.files:
-                    doc_file = documentation.files[file_path]
-                    revised_content = await self._apply_feedback_item(
-                        doc_file.content,
-                        item
-                    )
-                    if revised_content != doc_file.content:
-                        doc_file.content = revised_content
-                        doc_file.sections = await self._update_sections(revised_content)
+            # Apply every item to a file before re-sectioning it once
+            for file_path, doc_file in documentation.files.items():
+                revised_content = doc_file.content
+                for item in feedback_items:
+                    revised_content = self._apply_feedback_item(revised_content, item)
+                    
+                if revised_content != doc_file.content:
+                    documentation.files[file_path] = doc_file.model_copy(update={
+                        'content': revised_content,
+                        'sections': self._update_sections(revised_content)
+                    })
         except Exception as e:
             logger.error(f"Error applying general feedback: {str(e)}")
             raise
 
-    async def _apply_feedback_item(
+    def _apply_feedback_item(
         self,
         content: str,
         feedback: Dict
@@ -133,20 +314,20 @@ class ContentReviser:
         try:
             if feedback.get('suggested_changes'):
                 # Apply specific suggested changes
-                return await self._apply_suggested_changes(
+                return self._apply_suggested_changes(
                     content,
                     feedback['suggested_changes'],
                     feedback.get('location', {})
                 )
             elif feedback.get('type') == 'issue':
                 # Handle issues without specific suggestions
-                return await self._handle_issue(
+                return self._handle_issue(
                     content,
                     feedback
                 )
             else:
                 # Handle other feedback types
-                return await self._handle_general_feedback(
+                return self._handle_general_feedback(
                     content,
                     feedback
                 )
@@ -155,7 +336,7 @@ class ContentReviser:
             logger.error(f"Error applying feedback item: {str(e)}")
             return content
 
-    async def _apply_suggested_changes(
+    def _apply_suggested_changes(
         self,
         content: str,
         suggestions: str,
@@ -163,28 +344,27 @@ class ContentReviser:
     ) -> str:
         """Apply suggested changes to specific location in content."""
         try:
-            lines = content.splitlines()
-            
             if 'line' in location:
-                # Apply change to specific line
-                line_num = location['line']
-                if 0 <= line_num < len(lines):
-                    lines[line_num] = suggestions
+                # Apply change to specific line, splicing it into the content
+                bounds = _line_bounds(content, location['line'])
+                if bounds is not None:
+                    start, end = bounds
+                    return content[:start] + suggestions + content[end:]
             else:
                 # Try to find the best location for the change
-                content_blocks = content.split('\n\n')
-                best_block = self._find_best_match(suggestions, content_blocks)
+                best_block = _best_block_index(content, suggestions)
                 if best_block is not None:
+                    content_blocks = content.split('\n\n')
                     content_blocks[best_block] = suggestions
                     return '\n\n'.join(content_blocks)
                     
-            return '\n'.join(lines)
+            return content
 
         except Exception as e:
             logger.error(f"Error applying suggested changes: {str(e)}")
             return content
 
-    async def _handle_issue(
+    def _handle_issue(
         self,
         content: str,
         feedback: Dict
@@ -195,25 +375,24 @@ class ContentReviser:
             if 'location' in feedback:
                 location = feedback['location']
                 if 'line' in location:
-                    lines = content.splitlines()
-                    line_num = location['line']
-                    if 0 <= line_num < len(lines):
+                    bounds = _line_bounds(content, location['line'])
+                    if bounds is not None:
                         # Attempt to fix common issues
-                        fixed_line = await self._fix_common_issues(
-                            lines[line_num],
+                        start, end = bounds
+                        fixed_line = self._fix_common_issues(
+                            content[start:end],
                             feedback['message']
                         )
-                        lines[line_num] = fixed_line
-                        return '\n'.join(lines)
+                        return content[:start] + fixed_line + content[end:]
             
             # If no location or can't fix specifically, apply general improvements
-            return await self._improve_content(content, feedback['message'])
+            return self._improve_content(content, feedback['message'])
             
         except Exception as e:
             logger.error(f"Error handling issue: {str(e)}")
             return content
 
-    async def _handle_general_feedback(
+    def _handle_general_feedback(
         self,
         content: str,
         feedback: Dict
@@ -224,66 +403,53 @@ class ContentReviser:
             message = feedback.get('message', '')
             
             if 'clarity' in feedback_type.lower():
-                return await self._improve_clarity(content)
+                return self._improve_clarity(content)
             elif 'structure' in feedback_type.lower():
-                return await self._improve_structure(content)
+                return self._improve_structure(content)
             elif 'completeness' in feedback_type.lower():
-                return await self._improve_completeness(content, message)
+                return self._improve_completeness(content, message)
             else:
-                return await self._improve_content(content, message)
+                return self._improve_content(content, message)
                 
         except Exception as e:
             logger.error(f"Error handling general feedback: {str(e)}")
             return content
 
-    async def _update_sections(
+    def _update_sections(
         self,
         content: str
     ) -> List:
         """Update section breakdown after content changes."""
         sections = []
         current_section = None
+        current_lines: List[str] = []
         order = 1
         
         for line in content.splitlines():
             if line.startswith('#'):
                 if current_section:
+                    current_section['content'] = ''.join(current_lines)
                     sections.append(current_section)
                 
                 # Start new section
-                level = len(line.split()[0])  # Count # symbols
-                title = line.lstrip('#').strip()
+                stripped = line.lstrip('#')
+                level = len(line) - len(stripped)  # Count # symbols
                 current_section = {
-                    'title': title,
-                    'content': line + '\n',
+                    'title': stripped.strip(),
                     'level': level,
                     'order': order
                 }
+                current_lines = [line + '\n']
                 order += 1
             elif current_section:
-                current_section['content'] += line + '\n'
+                current_lines.append(line + '\n')
                 
         if current_section:
+            current_section['content'] = ''.join(current_lines)
             sections.append(current_section)
             
         return sections
 
-    def _find_best_match(
-        self,
-        text: str,
-        blocks: List[str]
-    ) -> Optional[int]:
-        """Find the best matching block for text insertion."""
-        if not blocks:
-            return None
-            
-        # Use difflib to find closest match
-        matcher = difflib.get_close_matches(text, blocks, n=1, cutoff=0.3)
-        if matcher:
-            return blocks.index(matcher[0])
-            
-        return None
-
     async def _track_revision(
         self,
         file_path: str,
@@ -293,14 +459,12 @@ class ContentReviser:
         iteration: int
     ) -> None:
         """Track revision history for a file."""
-        if file_path not in self.revision_history:
-            self.revision_history[file_path] = []
-            
+        # Only feedback ids are kept; the items themselves live in the review
         revision = {
             'timestamp': datetime.now().isoformat(),
             'iteration': iteration,
-            'feedback_items': feedback_items,
-            'changes': await self._compute_changes(original, revised)
+            'feedback_ids': [item.get('item_id') for item in feedback_items],
+            'changes': self._compute_changes(original, revised)
         }
         
         self.revision_history[file_path].append(revision)
@@ -309,7 +473,7 @@ class ContentReviser:
         cache_key = f"revision_history_{file_path}"
         self.cache.set(cache_key, self.revision_history[file_path])
 
-    async def _compute_changes(
+    def _compute_changes(
         self,
         original: str,
         revised: str
@@ -317,78 +481,62 @@ class ContentReviser:
         """Compute detailed changes between versions."""
         changes = []
         
-        # Split into lines and compute diff
+        # Split into lines and diff them; autojunk is off because it treats
+        # frequent lines (blank lines, fences, list markers) as junk and
+        # produces unstable hunks on longer documents
         original_lines = original.splitlines()
         revised_lines = revised.splitlines()
-        differ = difflib.unified_diff(
-            original_lines,
-            revised_lines,
-            lineterm=''
-        )
+        matcher = SequenceMatcher(None, original_lines, revised_lines, autojunk=False)
         
-        # Process diff output
-        current_section = None
-        for line in differ:
-            if line.startswith('---') or line.startswith('+++'):
-                continue
-                
-            if line.startswith('@@'):
-                # New section of changes
-                if current_section:
-                    changes.append(current_section)
-                current_section = {
-                    'type': 'section',
-                    'changes': []
-                }
-                continue
-                
-            if current_section is None:
-                continue
-                
-            if line.startswith('-'):
-                current_section['changes'].append({
-                    'type': 'removal',
-                    'content': line[1:].strip()
-                })
-            elif line.startswith('+'):
-                current_section['changes'].append({
-                    'type': 'addition',
-                    'content': line[1:].strip()
-                })
-            else:
-                current_section['changes'].append({
-                    'type': 'context',
-                    'content': line[1:].strip()
-                })
-                
-        # Add final section
-        if current_section:
-            changes.append(current_section)
+        # Each group of opcodes is one unified-diff hunk with 3 lines of context
+        for group in matcher.get_grouped_opcodes(3):
+            section_changes = []
+            for tag, i1, i2, j1, j2 in group:
+                if tag == 'equal':
+                    section_changes.extend(
+                        {'type': 'context', 'content': line.strip()}
+                        for line in original_lines[i1:i2]
+                    )
+                    continue
+                if tag in ('replace', 'delete'):
+                    section_changes.extend(
+                        {'type': 'removal', 'content': line.strip()}
+                        for line in original_lines[i1:i2]
+                    )
+                if tag in ('replace', 'insert'):
+                    section_changes.extend(
+                        {'type': 'addition', 'content': line.strip()}
+                        for line in revised_lines[j1:j2]
+                    )
+            changes.append({
+                'type': 'section',
+                'changes': _collapse_context_runs(section_changes)
+            })
             
         return changes
 
-    async def _fix_common_issues(self, line: str, issue_message: str) -> str:
+    def _fix_common_issues(self, line: str, issue_message: str) -> str:
         """Fix common documentation issues in a line."""
         # This would implement specific fixes for common issues
         # based on the issue message
         return line
 
-    async def _improve_clarity(self, content: str) -> str:
+    def _improve_clarity(self, content: str) -> str:
         """Improve content clarity."""
         # This would implement clarity improvements
         return content
 
-    async def _improve_structure(self, content: str) -> str:
+    def _improve_structure(self, content: str) -> str:
         """Improve content structure."""
         # This would implement structure improvements
         return content
 
-    async def _improve_completeness(self, content: str, message: str) -> str:
+    def _improve_completeness(self, content: str, message: str) -> str:
         """Improve content completeness."""
         # This would implement completeness improvements
         return content
 
-    async def _improve_content(self, content: str, message: str) -> str:
+    def _improve_content(self, content: str, message: str) -> str:
         """Apply general content improvements."""
         # This would implement general improvements based on feedback
         return content
\ No newline at end of file
@@ -1,18 +1,58 @@
 """Tool for processing review feedback and managing revisions."""
 from typing import Dict, List, Optional
+import functools
+import re
+from operator import itemgetter
+import time
 from datetime import datetime
+from difflib import SequenceMatcher
 from core.services.logging import setup_logger
 from core.services.cache import cache_manager
 from ..schemas.generated_content import GeneratedContent, DocumentFile
 
 logger = setup_logger(__name__)
 
+# Priority weights applied to incoming feedback items
+PRIORITY_WEIGHTS = {
+    'high': 1.0,
+    'medium': 0.6,
+    'low': 0.3
+}
+TYPE_MULTIPLIERS = {
+    'issue': 1.2,
+    'suggestion': 0.8,
+    'praise': 0.5
+}
+
+# (epoch second, ISO string) of the last timestamp handed out
+_now_iso_cache = [-1, '']
+
+def _now_iso() -> str:
+    """Get the current local time as an ISO string, at one-second resolution."""
+    second = int(time.time())
+    if second != _now_iso_cache[0]:
+        _now_iso_cache[0] = second
+        _now_iso_cache[1] = datetime.fromtimestamp(second).isoformat()
+    return _now_iso_cache[1]
+
+SUGGESTION_PATTERN_CACHE_SIZE = 64  # compiled suggestion matchers kept between checks
+
+@functools.lru_cache(maxsize=SUGGESTION_PATTERN_CACHE_SIZE)
+def _suggestion_pattern(suggestions: str) -> "re.Pattern[str]":
+    """Compile a case-insensitive literal matcher for suggested changes."""
+    return re.compile(re.escape(suggestions), re.IGNORECASE)
+
 class FeedbackProcessor:
     """Processes and manages documentation feedback."""
 
     def __init__(self):
         """Initialize the feedback processor."""
         self.cache = cache_manager
+        # Section matcher whose second sequence is the last updated content seen;
+        # SequenceMatcher indexes seq2, so repeat checks against it reuse that work
+        self._section_matcher = SequenceMatcher(autojunk=False)
+        self._matched_content: Optional[str] = None
+        self._matched_sections: List[str] = []
 
     async def process_feedback(
         self,
@@ -41,19 +81,17 @@ class FeedbackProcessor:
                 # Add metadata to feedback item
                 processed_item = {
                     **item,
-                    'processed_at': datetime.now().isoformat(),
+                    'processed_at': _now_iso(),
                     'status': 'pending',
-                    'priority_score': await self._calculate_priority(item)
+                    'priority_score': self._calculate_priority(item)
                 }
                 
                 organized_feedback[file_path].append(processed_item)
                 
             # Sort feedback items by priority
-            for file_path in organized_feedback:
-                organized_feedback[file_path].sort(
-                    key=lambda x: x['priority_score'],
-                    reverse=True
-                )
+            by_priority = itemgetter('priority_score')
+            for items in organized_feedback.values():
+                items.sort(key=by_priority, reverse=True)
                 
             return organized_feedback
 
@@ -61,20 +99,12 @@ class FeedbackProcessor:
             logger.error(f"Error processing feedback: {str(e)}")
             raise
 
-    async def _calculate_priority(self, feedback_item: Dict) -> float:
+    def _calculate_priority(self, feedback_item: Dict) -> float:
         """Calculate priority score for a feedback item."""
-        base_priority = {
-            'high': 1.0,
-            'medium': 0.6,
-            'low': 0.3
-        }.get(feedback_item.get('priority', 'low'), 0.1)
+        base_priority = PRIORITY_WEIGHTS.get(feedback_item.get('priority', 'low'), 0.1)
         
         # Adjust priority based on feedback type
-        type_multiplier = {
-            'issue': 1.2,
-            'suggestion': 0.8,
-            'praise': 0.5
-        }.get(feedback_item.get('type', 'suggestion'), 1.0)
+        type_multiplier = TYPE_MULTIPLIERS.get(feedback_item.get('type', 'suggestion'), 1.0)
         
         # Adjust if changes are required
         required_multiplier = 1.5 if feedback_item.get('requires_changes', False) else 1.0
@@ -105,10 +135,10 @@ class FeedbackProcessor:
             change_record = {
                 'feedback_id': feedback_item['item_id'],
                 'file_path': file_path,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _now_iso(),
                 'changes_made': True,
                 'content_length_diff': len(updated_content) - len(original_content),
-                'sections_changed': await self._detect_changed_sections(
+                'sections_changed': self._detect_changed_sections(
                     original_content,
                     updated_content
                 )
@@ -124,24 +154,34 @@ class FeedbackProcessor:
             logger.error(f"Error tracking changes: {str(e)}")
             raise
 
-    async def _detect_changed_sections(
+    def _detect_changed_sections(
         self,
         original: str,
         updated: str
     ) -> List[str]:
         """Detect which sections were changed."""
-        # Split content into sections and compare
+        # Split content into sections and align them by hash, so added,
+        # removed and shifted sections are reported too
+        if updated is not self._matched_content:
+            self._matched_content = updated
+            self._matched_sections = updated.split('\n\n')
+            self._section_matcher.set_seq2([hash(section) for section in self._matched_sections])
+        upd_sections = self._matched_sections
+        
         org_sections = original.split('\n\n')
-        upd_sections = updated.split('\n\n')
+        matcher = self._section_matcher
+        matcher.set_seq1([hash(section) for section in org_sections])
         
         changed_sections = []
         
-        for i, (org, upd) in enumerate(zip(org_sections, upd_sections)):
-            if org != upd:
-                # Try to extract section title
-                lines = org.split('\n')
-                title = lines[0] if lines else f"Section {i+1}"
-                changed_sections.append(title)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                continue
+            # Title changed and removed sections from the original, added ones from the update
+            sections, start, end = (org_sections, i1, i2) if i1 < i2 else (upd_sections, j1, j2)
+            for i in range(start, end):
+                title = sections[i].partition('\n')[0]
+                changed_sections.append(title or f"Section {i+1}")
                 
         return changed_sections
 
@@ -163,67 +203,107 @@ class FeedbackProcessor:
             Validation results
         """
         try:
-            # Initialize validation result
-            validation = {
-                'feedback_id': feedback_item['item_id'],
-                'timestamp': datetime.now().isoformat(),
-                'changes_detected': original_content != updated_content,
-                'addresses_feedback': False,
-                'validation_details': []
-            }
+            return self._build_validation(feedback_item, original_content, updated_content)
 
-            if not validation['changes_detected']:
-                validation['validation_details'].append(
-                    "No changes detected in content"
-                )
-                return validation
+        except Exception as e:
+            logger.error(f"Error validating improvements: {str(e)}")
+            raise
 
-            # Check if suggested changes were implemented
-            if feedback_item.get('suggested_changes'):
-                implemented = await self._check_suggested_changes(
-                    feedback_item['suggested_changes'],
-                    updated_content
-                )
-                validation['suggestions_implemented'] = implemented
-                validation['validation_details'].append(
-                    f"Suggested changes implemented: {implemented}"
-                )
+    async def validate_batch(
+        self,
+        feedback_items: List[Dict],
+        original_content: str,
+        updated_content: str
+    ) -> List[Dict]:
+        """
+        Validate several feedback items against the same revision.
+        
+        Args:
+            feedback_items: Original feedback items
+            original_content: Original content
+            updated_content: Updated content
+            
+        Returns:
+            Validation results in the same order as feedback_items
+        """
+        try:
+            # Each suggestion is a case-insensitive literal search; its compiled
+            # pattern is shared with validate_improvements
+            return [
+                self._build_validation(item, original_content, updated_content)
+                for item in feedback_items
+            ]
 
-            # Check if the feedback target area was modified
-            if 'location' in feedback_item:
-                target_modified = await self._check_target_modified(
-                    feedback_item['location'],
-                    original_content,
-                    updated_content
-                )
-                validation['target_modified'] = target_modified
-                validation['validation_details'].append(
-                    f"Target area modified: {target_modified}"
-                )
+        except Exception as e:
+            logger.error(f"Error validating improvements: {str(e)}")
+            raise
 
-            # Determine if feedback was addressed
-            validation['addresses_feedback'] = (
-                validation.get('suggestions_implemented', False) or
-                validation.get('target_modified', False)
-            )
+    def _build_validation(
+        self,
+        feedback_item: Dict,
+        original_content: str,
+        updated_content: str
+    ) -> Dict:
+        """Build the validation result for one feedback item."""
+        # Initialize validation result
+        validation = {
+            'feedback_id': feedback_item['item_id'],
+            'timestamp': _now_iso(),
+            'changes_detected': original_content != updated_content,
+            'addresses_feedback': False,
+            'validation_details': []
+        }
 
+        if not validation['changes_detected']:
+            validation['validation_details'].append(
+                "No changes detected in content"
+            )
             return validation
 
-        except Exception as e:
-            logger.error(f"Error validating improvements: {str(e)}")
-            raise
+        # Check if suggested changes were implemented
+        if feedback_item.get('suggested_changes'):
+            implemented = self._check_suggested_changes(
+                feedback_item['suggested_changes'],
+                updated_content
+            )
+            validation['suggestions_implemented'] = implemented
+            validation['validation_details'].append(
+                f"Suggested changes implemented: {implemented}"
+            )
+
+        # Check if the feedback target area was modified
+        if 'location' in feedback_item:
+            target_modified = self._check_target_modified(
+                feedback_item['location'],
+                original_content,
+                updated_content
+            )
+            validation['target_modified'] = target_modified
+            validation['validation_details'].append(
+                f"Target area modified: {target_modified}"
+            )
+
+        # Determine if feedback was addressed
+        validation['addresses_feedback'] = (
+            validation.get('suggestions_implemented', False) or
+            validation.get('target_modified', False)
+        )
+
+        return validation
 
-    async def _check_suggested_changes(
+    def _check_suggested_changes(
         self,
         suggestions: str,
         content: str
     ) -> bool:
         """Check if suggested changes were implemented."""
         # This is a simplified check - in practice, you'd want more sophisticated
-        # text comparison logic
-        return suggestions.lower() in content.lower()
+        # text comparison logic. A case-insensitive search avoids lowercasing
+        # a full copy of the content for every feedback item, and the compiled
+        # pattern is reused when the same suggestion is checked against many files.
+        return _suggestion_pattern(suggestions).search(content) is not None
 
-    async def _check_target_modified(
+    def _check_target_modified(
         self,
         location: Dict,
         original: str,
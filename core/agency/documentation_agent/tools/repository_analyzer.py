@@ -1,6 +1,11 @@
 """Tool for analyzing repository structure and determining type."""
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from pathlib import Path
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import asyncio
 import os
 import logging
 from core.services.logging import setup_logger
@@ -14,6 +19,214 @@ from ..schemas.repository_analysis import (
 
 logger = setup_logger(__name__)
 
+SKIPPED_DIRS = frozenset({".git", "node_modules"})  # never descended into during walks
+PREWARM_BATCH_SIZE = 64  # files queued on the prewarm executor at a time
+PREWARM_WORKERS = 2  # threads reading files ahead of analysis
+PREWARM_MAX_FILE_SIZE = 1024 * 1024  # larger files are not worth prewarming
+LINE_COUNT_CHUNK_SIZE = 1024 * 1024  # bytes read at a time when counting lines
+
+# File extension -> language whose lines are counted
+LANGUAGE_EXTENSIONS = {
+    ".py": "Python",
+    ".java": "Java",
+    ".js": "JavaScript",
+    ".ts": "TypeScript",
+    ".go": "Go",
+    ".rb": "Ruby",
+    ".php": "PHP",
+    ".cs": "C#",
+    ".cpp": "C++",
+    ".rs": "Rust",
+    ".swift": "Swift",
+    ".kt": "Kotlin",
+    ".scala": "Scala",
+    ".html": "HTML",
+    ".css": "CSS",
+    ".sql": "SQL",
+    ".sh": "Shell",
+    ".tf": "Terraform",
+    ".yaml": "YAML",
+    ".yml": "YAML",
+    ".json": "JSON",
+    ".md": "Markdown"
+}
+
+def _count_lines(path: str) -> int:
+    """Count the lines of a file from its raw bytes, or 0 if it cannot be read."""
+    count = 0
+    last = b"\n"
+    try:
+        with open(path, 'rb', buffering=0) as f:
+            while chunk := f.read(LINE_COUNT_CHUNK_SIZE):
+                count += chunk.count(b"\n")
+                last = chunk[-1:]
+    except OSError:
+        return 0
+    # A final line without a trailing newline still counts
+    return count + (last != b"\n")
+
+def _walk_repository(repo_path: str) -> Tuple[DirectoryInfo, Dict[str, int], array]:
+    """
+    Walk a repository once, collecting everything the analysis needs.
+    
+    Args:
+        repo_path: Path to the repository root
+        
+    Returns:
+        The root directory listing, line counts per language and the size of every file
+    """
+    root = Path(repo_path)
+    root_files: List[FileInfo] = []
+    root_subdirs: List[str] = []
+    language_lines: Counter = Counter()
+    sizes = array('q')
+    
+    pending = [(repo_path, True)]
+    while pending:
+        current, at_root = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if at_root and not entry.name.startswith('.'):
+                            root_subdirs.append(entry.name)
+                        if not entry.is_symlink() and entry.name not in SKIPPED_DIRS:
+                            pending.append((entry.path, False))
+                    elif entry.is_file():
+                        ext = os.path.splitext(entry.name)[1]
+                        stat = entry.stat()
+                        sizes.append(stat.st_size)
+                        if at_root:
+                            root_files.append(FileInfo(
+                                path=f"{root.name}/{entry.name}",
+                                type=ext,
+                                size=stat.st_size,
+                                last_modified=str(datetime.fromtimestamp(stat.st_mtime))
+                            ))
+                        language = LANGUAGE_EXTENSIONS.get(ext)
+                        if language:
+                            language_lines[language] += _count_lines(entry.path)
+        except OSError:
+            if at_root:
+                raise
+            continue
+            
+    root_dir = DirectoryInfo(
+        path=root.name,
+        files=root_files,
+        subdirectories=root_subdirs
+    )
+    languages = {language: lines for language, lines in language_lines.items() if lines > 0}
+    return root_dir, languages, sizes
+
+def build_pattern_index(repo_types: Dict[str, Sequence[str]]) -> Dict[str, List[Tuple[str, str]]]:
+    """Index repository type patterns by their top-level path component."""
+    index: Dict[str, List[Tuple[str, str]]] = {}
+    for repo_type, patterns in repo_types.items():
+        for pattern in patterns:
+            index.setdefault(pattern.split("/", 1)[0], []).append((repo_type, pattern))
+    return index
+
+def match_repo_patterns(
+    repo_path: str,
+    pattern_index: Dict[str, List[Tuple[str, str]]]
+) -> Dict[str, List[str]]:
+    """
+    Find which indexed patterns are present in a repository.
+    
+    The top level is listed once; nested patterns are only probed on disk
+    when their first component is a directory that is actually present.
+    
+    Args:
+        repo_path: Path to the repository root
+        pattern_index: Patterns indexed by build_pattern_index
+        
+    Returns:
+        Detected patterns per repository type, in index order
+    """
+    with os.scandir(repo_path) as scan:
+        entries = {entry.name: entry.is_dir() for entry in scan}
+        
+    detected: Dict[str, List[str]] = {}
+    for head, targets in pattern_index.items():
+        if head not in entries:
+            continue
+        for repo_type, pattern in targets:
+            if pattern == head or (
+                entries[head] and os.path.lexists(os.path.join(repo_path, pattern))
+            ):
+                detected.setdefault(repo_type, []).append(pattern)
+    return detected
+
+def _resolve_head(repo_path: str) -> str:
+    """
+    Get the commit SHA checked out in a repository, following the ref in HEAD.
+    
+    Commits and pulls update the branch ref rather than HEAD itself, so the
+    resolved SHA is what identifies the checkout.
+    
+    Args:
+        repo_path: Path to the repository root
+        
+    Returns:
+        The commit SHA, or an empty string if it cannot be resolved
+    """
+    git_dir = os.path.join(repo_path, ".git")
+    try:
+        with open(os.path.join(git_dir, "HEAD"), 'r', encoding='utf-8') as f:
+            head = f.read().strip()
+        if not head.startswith("ref: "):
+            return head  # Detached HEAD holds the SHA itself
+        ref = head[len("ref: "):]
+        
+        ref_path = os.path.join(git_dir, *ref.split("/"))
+        if os.path.isfile(ref_path):
+            with open(ref_path, 'r', encoding='utf-8') as f:
+                return f.read().strip()
+                
+        # Refs that have been packed live in packed-refs as "<sha> <ref>"
+        with open(os.path.join(git_dir, "packed-refs"), 'r', encoding='utf-8') as f:
+            for line in f:
+                sha, _, name = line.strip().partition(" ")
+                if name == ref:
+                    return sha
+    except OSError:
+        pass
+    return ""
+
+# Prewarm reads get their own small pool so they never queue ahead of the
+# analysis scans in the default executor
+_PREWARM_EXECUTOR = ThreadPoolExecutor(max_workers=PREWARM_WORKERS, thread_name_prefix="prewarm")
+
+def _read_file_quietly(path: str) -> None:
+    """Read a file and discard its content, ignoring read errors."""
+    try:
+        with open(path, 'rb') as f:
+            f.read(PREWARM_MAX_FILE_SIZE)
+    except OSError:
+        pass
+
+def _list_prewarm_files(repo_path: str) -> List[str]:
+    """List the small files the analysis walk will count lines in, pruned like that walk."""
+    paths = []
+    pending = [repo_path]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink() and entry.name not in SKIPPED_DIRS:
+                            pending.append(entry.path)
+                    elif (
+                        entry.is_file()
+                        and os.path.splitext(entry.name)[1] in LANGUAGE_EXTENSIONS
+                        and entry.stat().st_size <= PREWARM_MAX_FILE_SIZE
+                    ):
+                        paths.append(entry.path)
+        except OSError:
+            continue
+    return paths
+
 class RepositoryAnalyzer:
     """Analyzes repository structure and determines repository type."""
 
@@ -44,6 +257,7 @@ class RepositoryAnalyzer:
             "__init__.py"
         ]
     }
+    PATTERN_INDEX = build_pattern_index(REPO_TYPE_PATTERNS)
 
     def __init__(self):
         """Initialize the repository analyzer."""
@@ -62,25 +276,23 @@ class RepositoryAnalyzer:
         logger.info(f"Analyzing repository at: {repo_path}")
         
         try:
-            # Check cache first
-            cache_key = f"repo_analysis_{repo_path}"
+            # Check cache first; building the key reads the disk, so keep it off the loop
+            cache_key = await asyncio.to_thread(self._analysis_cache_key, repo_path)
             cached_result = self.cache.get(cache_key)
             if cached_result:
                 logger.info("Using cached repository analysis")
                 return cached_result
 
-            # Get repository structure
-            root_dir = await self._analyze_directory(Path(repo_path))
-            
-            # Detect patterns
-            patterns = await self._detect_patterns(repo_path)
+            # One walk yields the structure, language and size statistics; the
+            # pattern probes are independent, so both run side by side in threads
+            (root_dir, languages, file_sizes), patterns = await asyncio.gather(
+                asyncio.to_thread(_walk_repository, repo_path),
+                asyncio.to_thread(self._detect_patterns, repo_path)
+            )
             
             # Determine repository type
             repo_type = await self._determine_repo_type(patterns)
             
-            # Get language statistics
-            languages = await self._analyze_languages(repo_path)
-            
             # Create analysis result
             analysis = RepositoryAnalysis(
                 repository_type=repo_type,
@@ -88,8 +300,8 @@ class RepositoryAnalyzer:
                 detected_patterns=patterns,
                 languages=languages,
                 primary_language=max(languages.items(), key=lambda x: x[1])[0] if languages else None,
-                total_files=sum(1 for _ in Path(repo_path).rglob("*") if _.is_file()),
-                total_size=sum(_.stat().st_size for _ in Path(repo_path).rglob("*") if _.is_file()),
+                total_files=len(file_sizes),
+                total_size=sum(file_sizes),
                 analysis_timestamp=str(datetime.now())
             )
             
@@ -102,50 +314,39 @@ class RepositoryAnalyzer:
             logger.error(f"Error analyzing repository: {str(e)}", exc_info=True)
             raise
 
-    async def _analyze_directory(self, path: Path) -> DirectoryInfo:
-        """Analyze a directory and its contents."""
-        files = []
-        subdirs = []
-        
-        for item in path.iterdir():
-            if item.is_file():
-                files.append(FileInfo(
-                    path=str(item.relative_to(path.parent)),
-                    type=item.suffix,
-                    size=item.stat().st_size,
-                    last_modified=str(datetime.fromtimestamp(item.stat().st_mtime))
-                ))
-            elif item.is_dir() and not item.name.startswith('.'):
-                subdirs.append(item.name)
-                
-        return DirectoryInfo(
-            path=str(path.relative_to(path.parent)),
-            files=files,
-            subdirectories=subdirs
+    def _analysis_cache_key(self, repo_path: str) -> str:
+        """Build a cache key that changes when the checked-out commit or the top level changes."""
+        with os.scandir(repo_path) as entries:
+            stamps = sorted(
+                (entry.name, entry.stat(follow_symlinks=False).st_mtime_ns)
+                for entry in entries
+            )
+        return "repo_analysis_" + self.cache.generate_key(
+            repo_path, _resolve_head(repo_path), *stamps
         )
 
-    async def _detect_patterns(self, repo_path: str) -> RepositoryPatterns:
-        """Detect repository patterns."""
-        patterns = RepositoryPatterns()
-        repo_path = Path(repo_path)
+    async def prewarm(self, repo_path: str) -> None:
+        """
+        Read repository files ahead of analysis so they are in the page cache.
         
-        for repo_type, type_patterns in self.REPO_TYPE_PATTERNS.items():
-            detected = []
-            for pattern in type_patterns:
-                pattern_path = repo_path / pattern
-                if pattern_path.exists():
-                    detected.append(pattern)
-                    
-            if repo_type == "spring_boot":
-                patterns.spring_boot_patterns = detected
-            elif repo_type == "nginx":
-                patterns.nginx_patterns = detected
-            elif repo_type == "bounded_context":
-                patterns.bounded_context_patterns = detected
-            elif repo_type == "python":
-                patterns.python_patterns = detected
-                
-        return patterns
+        Args:
+            repo_path: Path to the repository root
+        """
+        loop = asyncio.get_running_loop()
+        paths = await loop.run_in_executor(_PREWARM_EXECUTOR, _list_prewarm_files, repo_path)
+        for start in range(0, len(paths), PREWARM_BATCH_SIZE):
+            await asyncio.gather(*(
+                loop.run_in_executor(_PREWARM_EXECUTOR, _read_file_quietly, path)
+                for path in paths[start:start + PREWARM_BATCH_SIZE]
+            ))
+
+    def _detect_patterns(self, repo_path: str) -> RepositoryPatterns:
+        """Detect repository patterns."""
+        detected = match_repo_patterns(repo_path, self.PATTERN_INDEX)
+        return RepositoryPatterns(**{
+            f"{repo_type}_patterns": detected.get(repo_type, [])
+            for repo_type in self.REPO_TYPE_PATTERNS
+        })
 
     async def _determine_repo_type(self, patterns: RepositoryPatterns) -> str:
         """Determine repository type based on detected patterns."""
@@ -163,47 +364,3 @@ class RepositoryAnalyzer:
             return "unknown"
             
         return max(matches.items(), key=lambda x: x[1])[0]
-
-    async def _analyze_languages(self, repo_path: str) -> Dict[str, int]:
-        """Analyze programming languages used in the repository."""
-        extensions = {
-            ".py": "Python",
-            ".java": "Java",
-            ".js": "JavaScript",
-            ".ts": "TypeScript",
-            ".go": "Go",
-            ".rb": "Ruby",
-            ".php": "PHP",
-            ".cs": "C#",
-            ".cpp": "C++",
-            ".rs": "Rust",
-            ".swift": "Swift",
-            ".kt": "Kotlin",
-            ".scala": "Scala",
-            ".html": "HTML",
-            ".css": "CSS",
-            ".sql": "SQL",
-            ".sh": "Shell",
-            ".tf": "Terraform",
-            ".yaml": "YAML",
-            ".yml": "YAML",
-            ".json": "JSON",
-            ".md": "Markdown"
-        }
-        
-        language_lines = {}
-        repo_path = Path(repo_path)
-        
-        for ext, lang in extensions.items():
-            line_count = 0
-            for file_path in repo_path.rglob(f"*{ext}"):
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        line_count += sum(1 for _ in f)
-                except Exception:
-                    continue
-                    
-            if line_count > 0:
-                language_lines[lang] = line_count
-                
-        return language_lines
\ No newline at end of file
@@ -1,7 +1,13 @@
 """Tool for selecting and configuring documentation standards."""
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import re
 from pathlib import Path
 import yaml
+try:
+    from yaml import CSafeLoader as SafeLoader  # libyaml C parser, when PyYAML was built with it
+except ImportError:
+    from yaml import SafeLoader
 from core.services.logging import setup_logger
 from core.services.cache import cache_manager
 from ..schemas.documentation_standard import (
@@ -13,6 +19,26 @@ from ..schemas.documentation_standard import (
 
 logger = setup_logger(__name__)
 
+# Repository types are plain names, so they can never leave the standards directory
+_REPO_TYPE_RE = re.compile(r"[A-Za-z0-9_-]+")
+
+# Parsed standards shared by all selectors: file path -> (mtime_ns, standard)
+_STANDARDS_CACHE: Dict[str, Tuple[int, DocumentationStandard]] = {}
+
+def _load_standard_file(standard_file: Path) -> DocumentationStandard:
+    """Parse a standard file, reusing the parsed result while its mtime is unchanged."""
+    key = str(standard_file)
+    mtime = standard_file.stat().st_mtime_ns
+    cached = _STANDARDS_CACHE.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    # libyaml detects the encoding itself and parses raw bytes fastest
+    with open(standard_file, 'rb') as f:
+        standard = DocumentationStandard(**yaml.load(f, Loader=SafeLoader))
+    _STANDARDS_CACHE[key] = (mtime, standard)
+    return standard
+
 class StandardSelector:
     """Selects and configures documentation standards based on repository type."""
 
@@ -22,31 +48,47 @@ class StandardSelector:
         self.cache = cache_manager
         self._standards: Dict[str, DocumentationStandard] = {}
 
-    async def load_standards(self) -> None:
-        """Load all documentation standards from files."""
+    async def preload_all(self) -> None:
+        """Load every documentation standard up front, parsing the files in parallel."""
         try:
-            # Check cache first
-            cached_standards = self.cache.get("documentation_standards")
-            if cached_standards:
-                self._standards = cached_standards
-                return
-
-            for standard_file in self.standards_path.glob("*.yaml"):
-                try:
-                    with open(standard_file, 'r') as f:
-                        data = yaml.safe_load(f)
-                        standard = DocumentationStandard(**data)
-                        self._standards[standard.repository_type] = standard
-                except Exception as e:
-                    logger.error(f"Error loading standard from {standard_file}: {str(e)}")
-
-            # Cache the standards
-            self.cache.set("documentation_standards", self._standards)
+            await asyncio.gather(*(
+                self._load_one(standard_file.stem)
+                for standard_file in self.standards_path.glob("*.yaml")
+            ))
 
         except Exception as e:
             logger.error(f"Error loading standards: {str(e)}")
             raise
 
+    async def _load_one(self, repo_type: str) -> Optional[DocumentationStandard]:
+        """Load the standard for one repository type from {repo_type}.yaml on first use."""
+        standard = self._standards.get(repo_type)
+        if standard is not None:
+            return standard
+            
+        if not _REPO_TYPE_RE.fullmatch(repo_type):
+            logger.warning(f"Invalid repository type: {repo_type!r}")
+            return None
+            
+        standard_file = self.standards_path / f"{repo_type}.yaml"
+        if not standard_file.is_file():
+            return None
+            
+        try:
+            standard = await asyncio.to_thread(_load_standard_file, standard_file)
+        except Exception as e:
+            logger.error(f"Error loading standard from {standard_file}: {str(e)}")
+            return None
+            
+        if standard.repository_type != repo_type:
+            logger.error(
+                f"Standard in {standard_file} is for {standard.repository_type}, not {repo_type}"
+            )
+            return None
+            
+        self._standards[repo_type] = standard
+        return standard
+
     async def select_standard(
         self, 
         repo_type: str,
@@ -63,15 +105,11 @@ class StandardSelector:
             Selected DocumentationStandard
         """
         try:
-            # Ensure standards are loaded
-            if not self._standards:
-                await self.load_standards()
-
-            # Get base standard
-            base_standard = self._standards.get(repo_type)
+            # Get base standard, loading only the file for this type
+            base_standard = await self._load_one(repo_type)
             if not base_standard:
                 logger.warning(f"No standard found for {repo_type}, using unknown type standard")
-                base_standard = self._standards.get("unknown")
+                base_standard = await self._load_one("unknown")
                 if not base_standard:
                     raise ValueError("No default standard available")
 
@@ -81,7 +119,7 @@ class StandardSelector:
                 rules = list(base_standard.rules)  # Create copy of base rules
                 rules.extend(custom_rules)
                 return DocumentationStandard(
-                    **{**base_standard.dict(), "rules": rules}
+                    **{**base_standard.model_dump(), "rules": rules}
                 )
 
             return base_standard
@@ -145,7 +183,7 @@ class StandardSelector:
         """
         try:
             # Create copy of base standard
-            custom_standard = DocumentationStandard(**base_standard.dict())
+            custom_standard = DocumentationStandard(**base_standard.model_dump())
             
             # Apply customizations
             if "rules" in customizations:
@@ -1,7 +1,13 @@
 """Tool for managing documentation templates."""
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import asyncio
 from pathlib import Path
+from string import Template
 import yaml
+try:
+    from yaml import CSafeLoader as SafeLoader  # libyaml C parser, when PyYAML was built with it
+except ImportError:
+    from yaml import SafeLoader
 from datetime import datetime
 from core.services.logging import setup_logger
 from core.services.cache import cache_manager
@@ -9,6 +15,23 @@ from ..schemas.documentation_standard import DocumentationTemplate, TemplateVari
 
 logger = setup_logger(__name__)
 
+# Parsed templates shared by all managers: file path -> (mtime_ns, template)
+_TEMPLATES_CACHE: Dict[str, Tuple[int, DocumentationTemplate]] = {}
+
+def _load_template_file(template_file: Path) -> DocumentationTemplate:
+    """Parse a template file, reusing the parsed result while its mtime is unchanged."""
+    key = str(template_file)
+    mtime = template_file.stat().st_mtime_ns
+    cached = _TEMPLATES_CACHE.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    # libyaml detects the encoding itself and parses raw bytes fastest
+    with open(template_file, 'rb') as f:
+        template = DocumentationTemplate(**yaml.load(f, Loader=SafeLoader))
+    _TEMPLATES_CACHE[key] = (mtime, template)
+    return template
+
 class TemplateManager:
     """Manages documentation templates and their application."""
 
@@ -21,24 +44,12 @@ class TemplateManager:
     async def load_templates(self) -> None:
         """Load all templates from the templates directory."""
         try:
-            # Check cache first
-            cached_templates = self.cache.get("documentation_templates")
-            if cached_templates:
-                self._templates = cached_templates
-                return
-
             for template_file in self.templates_path.glob("*.yaml"):
                 try:
-                    with open(template_file, 'r') as f:
-                        data = yaml.safe_load(f)
-                        template = DocumentationTemplate(**data)
-                        self._templates[template.template_id] = template
+                    self._register(await asyncio.to_thread(_load_template_file, template_file))
                 except Exception as e:
                     logger.error(f"Error loading template from {template_file}: {str(e)}")
 
-            # Cache the templates
-            self.cache.set("documentation_templates", self._templates)
-
         except Exception as e:
             logger.error(f"Error loading templates: {str(e)}")
             raise
@@ -49,6 +60,10 @@ class TemplateManager:
             await self.load_templates()
         return self._templates.get(template_id)
 
+    def _register(self, template: DocumentationTemplate) -> None:
+        """Store a loaded, created or updated template."""
+        self._templates[template.template_id] = template
+
     async def validate_template(
         self,
         template: DocumentationTemplate,
@@ -96,18 +111,11 @@ class TemplateManager:
             if not await self.validate_template(template, variables):
                 raise ValueError("Template validation failed")
 
-            content = template.content
+            # Defaults fill in any variables that were not provided
+            values = {var.name: var.default for var in template.variables if var.default}
+            values.update(variables)
             
-            # Apply variables
-            for var_name, var_value in variables.items():
-                content = content.replace(f"${var_name}", str(var_value))
-                
-            # Apply any default values for missing variables
-            for var in template.variables:
-                if var.name not in variables and var.default:
-                    content = content.replace(f"${var.name}", str(var.default))
-                    
-            return content
+            return Template(template.content).safe_substitute(values)
 
         except Exception as e:
             logger.error(f"Error applying template: {str(e)}")
@@ -140,7 +148,7 @@ class TemplateManager:
             template = DocumentationTemplate(
                 template_id=template_id,
                 name=f"Template {template_id}",
-                description=f"Documentation template for {', '.join(applies_to)}",
+                description=f"Documentation template for {', '.join(sorted(applies_to))}",
                 content=content,
                 variables=variables,
                 file_name=file_name,
@@ -150,13 +158,11 @@ class TemplateManager:
             if save:
                 # Save to templates directory
                 template_path = self.templates_path / f"{template_id}.yaml"
-                template_data = yaml.dump(template.dict())
+                template_data = yaml.dump(template.model_dump())
                 
-                template_path.write_text(template_data)
+                template_path.write_text(template_data, encoding="utf-8")
                 
-                # Update cache
-                self._templates[template_id] = template
-                self.cache.set("documentation_templates", self._templates)
+                self._register(template)
                 
             return template
 
@@ -185,20 +191,18 @@ class TemplateManager:
                 raise ValueError(f"Template not found: {template_id}")
                 
             # Update template fields
-            template_dict = template.dict()
+            template_dict = template.model_dump()
             template_dict.update(updates)
             
             updated_template = DocumentationTemplate(**template_dict)
             
             # Save updates
             template_path = self.templates_path / f"{template_id}.yaml"
-            template_data = yaml.dump(updated_template.dict())
+            template_data = yaml.dump(updated_template.model_dump())
             
-            template_path.write_text(template_data)
+            template_path.write_text(template_data, encoding="utf-8")
             
-            # Update cache
-            self._templates[template_id] = updated_template
-            self.cache.set("documentation_templates", self._templates)
+            self._register(updated_template)
             
             return updated_template
 
@@ -7,7 +7,7 @@ from core.services.logging.logging_service import setup_logger
 
 logger = setup_logger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     """Represents a system event."""
     type: str
@@ -60,7 +60,8 @@ class EventBus:
             
         logger.debug(f"Publishing event: {event.type} from {event.source}")
         self.event_history.append(event)
-        await self._queue.put(event)
+        # The queue is unbounded, so enqueueing never has to wait
+        self._queue.put_nowait(event)
         
     def subscribe(self, event_type: str, callback: Callable) -> None:
         """Subscribe to events of a specific type."""
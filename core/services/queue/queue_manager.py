@@ -1,5 +1,5 @@
 """Task queue manager for handling concurrent operations."""
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, Set
 import asyncio
 from dataclasses import dataclass
 from datetime import datetime
@@ -36,8 +36,11 @@ class QueueManager:
         self.max_concurrent_tasks = max_concurrent_tasks
         self.tasks: Dict[str, Task] = {}
         self.queue = asyncio.PriorityQueue()
-        self.running_tasks: List[str] = []
+        self.running_tasks: Set[str] = set()
         self._running = False
+        self._slot_available = asyncio.Event()
+        self._slot_available.set()
+        self._runners: Set[asyncio.Task] = set()  # keeps running task coroutines referenced
         
     async def start(self):
         """Start processing tasks."""
@@ -82,7 +85,8 @@ class QueueManager:
         """Process tasks from the queue."""
         while self._running:
             if len(self.running_tasks) >= self.max_concurrent_tasks:
-                await asyncio.sleep(0.1)
+                self._slot_available.clear()
+                await self._slot_available.wait()
                 continue
                 
             try:
@@ -95,7 +99,7 @@ class QueueManager:
                     
                 task.status = TaskStatus.RUNNING
                 task.started_at = datetime.now()
-                self.running_tasks.append(task_id)
+                self.running_tasks.add(task_id)
                 
                 await event_bus.publish(Event(
                     type="task_started",
@@ -103,31 +107,39 @@ class QueueManager:
                     data={"task_id": task_id}
                 ))
                 
-                # Execute task (this will be implemented by the task handler)
-                try:
-                    result = await self._execute_task(task)
-                    task.status = TaskStatus.COMPLETED
-                    await event_bus.publish(Event(
-                        type="task_completed",
-                        source="queue_manager",
-                        data={"task_id": task_id, "result": result}
-                    ))
-                except Exception as e:
-                    task.status = TaskStatus.FAILED
-                    task.error = str(e)
-                    await event_bus.publish(Event(
-                        type="task_failed",
-                        source="queue_manager",
-                        data={"task_id": task_id, "error": str(e)}
-                    ))
-                
-                task.completed_at = datetime.now()
-                self.running_tasks.remove(task_id)
-                self.queue.task_done()
+                # Run the task alongside others; its slot is released when it finishes
+                runner = asyncio.create_task(self._run_task(task))
+                self._runners.add(runner)
+                runner.add_done_callback(self._runners.discard)
                 
             except Exception as e:
                 logger.error(f"Error processing task: {str(e)}")
                 
+    async def _run_task(self, task: Task) -> None:
+        """Execute a started task, publish its outcome and free its slot."""
+        try:
+            # Execute task (this will be implemented by the task handler)
+            result = await self._execute_task(task)
+            task.status = TaskStatus.COMPLETED
+            await event_bus.publish(Event(
+                type="task_completed",
+                source="queue_manager",
+                data={"task_id": task.id, "result": result}
+            ))
+        except Exception as e:
+            task.status = TaskStatus.FAILED
+            task.error = str(e)
+            await event_bus.publish(Event(
+                type="task_failed",
+                source="queue_manager",
+                data={"task_id": task.id, "error": str(e)}
+            ))
+        finally:
+            task.completed_at = datetime.now()
+            self.running_tasks.discard(task.id)
+            self._slot_available.set()
+            self.queue.task_done()
+                
     async def _execute_task(self, task: Task) -> Dict[str, Any]:
         """Execute a task. This should be overridden by the task handler."""
         raise NotImplementedError
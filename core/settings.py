@@ -71,12 +71,21 @@ SUPPORTED_FILE_TYPES = (
     '.hcl'
 )
 
+# Cache Settings
+CACHE_DIR = Path(os.getenv("DOCSMITH_CACHE_DIR", Path.home() / ".docsmith"))
+REPO_TYPE_CACHE_PATH = CACHE_DIR / "cache.sqlite"  # persisted repository type detection
+
 # Output Settings
 DEFAULT_DOCS_PATH = "docs/"
 DEFAULT_README = "README.md"
 
 # Performance Settings
 MAX_CONCURRENT_TASKS = 5
+# Repositories processed at once. The documentation agent keeps per-run state
+# (current repository, iteration, documents by version), so keep this at 1
+# until that state is tracked per run
+MAX_CONCURRENT_REPOS = int(os.getenv("DOCSMITH_MAX_CONCURRENT_REPOS", "1"))
+LLM_CONCURRENCY = int(os.getenv("DOCSMITH_LLM_CONCURRENCY", "4"))  # generation/revision calls in flight at once
 RATE_LIMIT_REQUESTS = 60  # requests per minute
 RATE_LIMIT_TOKENS = 90000  # tokens per minute
 